@@ -1,252 +1,407 @@
-from flask import Flask, render_template, jsonify
+import os
+
+# Use the native (upb) protobuf backend for parsing the realtime feeds; this
+# has to be set before any protobuf module is imported.
+os.environ.setdefault('PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION', 'upb')
+
+from flask import Flask, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from google.protobuf.internal import api_implementation
 from google.transit import gtfs_realtime_pb2
 import requests
+from requests.adapters import HTTPAdapter
 import csv
-import os
+import hashlib
+import orjson
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from operator import itemgetter
 import threading
 import time
 
+# Refuse to run on the pure-Python protobuf decoder, which is many times
+# slower at parsing the feeds
+if api_implementation.Type() not in ('cpp', 'upb'):
+    raise RuntimeError(
+        f"protobuf is using the '{api_implementation.Type()}' backend; "
+        "install protobuf>=4.21 to get the native upb backend"
+    )
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify, tojson and request.get_json"""
+
+    def dumps(self, obj, **kwargs):
+        # Map the json.dumps options Flask and Jinja pass to orjson flags;
+        # non-str keys and dates go through the same handling as Flask's default
+        options = dict(kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if options.pop('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if options.pop('indent', None):
+            option |= orjson.OPT_INDENT_2
+        # orjson always emits UTF-8 with compact separators
+        options.pop('ensure_ascii', None)
+        options.pop('separators', None)
+        options.setdefault('default', self.default)
+        default = options.pop('default')
+
+        # Anything else (e.g. a custom cls) needs the stdlib encoder
+        if options:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        # orjson has no equivalent of json.loads hooks
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+MTA_ENDPOINTS = [
+    'https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs-nqrw',
+    'https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs',
+    'https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs-l'
+]
+
+GTFS_DIR = os.path.join(os.path.dirname(__file__), 'gtfs_subway')
+
+# Pickled static GTFS lookups, reused until the source .txt files change
+GTFS_CACHE_FILE = os.path.join(GTFS_DIR, '_cache.pkl')
+GTFS_CACHE_VERSION = 4
+
+# Platform stop_ids shown on the board
+TARGET_STOPS = frozenset({"634N", "634S", "635N", "635S", "L03N", "L03S", "R19N", "R19S", "R20N", "R20S"})
+
+# Direction implied by each platform's N/S suffix, used when a trip has no
+# direction_id (0 = Northbound, 1 = Southbound)
+STOP_DIRECTION_IDS = {stop_id: 0 if stop_id.endswith('N') else 1 for stop_id in TARGET_STOPS}
+
+# Display names by direction_id; the L uses geographic names
+DIRECTION_LABELS = {0: "Uptown", 1: "Downtown"}
+L_DIRECTION_LABELS = {0: "Manhattan Bound", 1: "Brooklyn Bound"}
 
-# Global variables to store the latest data
-latest_data = {}
-data_lock = threading.Lock()
-trips_headsign_by_id = None
-trips_headsign_by_route_direction = None
+# Shared HTTP session (keep-alive connections) and a worker per endpoint so
+# the feeds are downloaded concurrently. All feeds are on one host, so keep
+# one pooled connection per concurrent request to skip the TLS handshake on
+# every update
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=len(MTA_ENDPOINTS)))
+fetch_executor = ThreadPoolExecutor(max_workers=len(MTA_ENDPOINTS))
+
+# Validators and parsed feed from the last successful fetch of each endpoint,
+# so unchanged feeds come back as 304 and are not parsed again. Each worker
+# only touches its own endpoint's entry
+feed_cache = {}
+
+def read_gtfs_cache(name, *source_files):
+    """Return a cached lookup if it was built from the current source_files, else None"""
+    try:
+        with open(GTFS_CACHE_FILE, 'rb') as f:
+            cache = pickle.load(f)
+        if cache.get('version') != GTFS_CACHE_VERSION:
+            return None
+        source_mtimes, data = cache[name]
+        if source_mtimes != tuple(os.path.getmtime(source_file) for source_file in source_files):
+            return None
+        return data
+    except (OSError, KeyError, EOFError, pickle.UnpicklingError):
+        return None
+
+def write_gtfs_cache(name, source_files, data):
+    """Store a parsed lookup in the cache file, tagged with its source files' mtimes"""
+    cache = {'version': GTFS_CACHE_VERSION}
+    try:
+        with open(GTFS_CACHE_FILE, 'rb') as f:
+            existing = pickle.load(f)
+        if existing.get('version') == GTFS_CACHE_VERSION:
+            cache = existing
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    cache[name] = (tuple(os.path.getmtime(source_file) for source_file in source_files), data)
+    try:
+        # Write to a temporary file first so readers never see a partial cache
+        tmp_file = f"{GTFS_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, GTFS_CACHE_FILE)
+    except OSError as e:
+        print(f"Error writing GTFS cache: {e}")
 
 def load_stops_data():
     """Load stops data into a dictionary for fast lookup"""
+    stops_file = os.path.join(GTFS_DIR, 'stops.txt')
+    stops = read_gtfs_cache('stops', stops_file)
+    if stops is not None:
+        return stops
+
     stops = {}
-    stops_file = os.path.join(os.path.dirname(__file__), 'gtfs_subway', 'stops.txt')
-    
     with open(stops_file, 'r') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        stop_id_idx = header.index('stop_id')
+        stop_name_idx = header.index('stop_name')
         for row in reader:
-            stops[row['stop_id']] = row['stop_name']
+            # Skip blank or short rows (DictReader used to drop blank lines)
+            if len(row) <= max(stop_id_idx, stop_name_idx):
+                continue
+            stops[row[stop_id_idx]] = row[stop_name_idx]
     
+    write_gtfs_cache('stops', [stops_file], stops)
     return stops
 
 def load_trips_headsigns():
     """Load trip headsigns keyed by trip_id from trips.txt (GTFS static)."""
-    trips_file = os.path.join(os.path.dirname(__file__), 'gtfs_subway', 'trips.txt')
+    trips_file = os.path.join(GTFS_DIR, 'trips.txt')
+    cached = read_gtfs_cache('trips', trips_file)
+    if cached is not None:
+        return cached
+
     headsign_by_trip_id = {}
-    headsign_by_route_direction = {}  # New: route_id + direction_id -> headsign
+    headsign_by_route_direction = {}  # (route_id, direction_id) -> headsign
+    loaded = True
     try:
         with open(trips_file, 'r') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader)
+            trip_id_idx = header.index('trip_id')
+            route_id_idx = header.index('route_id')
+            # trip_headsign and direction_id are optional in GTFS (-1 = missing)
+            headsign_idx = header.index('trip_headsign') if 'trip_headsign' in header else -1
+            direction_id_idx = header.index('direction_id') if 'direction_id' in header else -1
             for row in reader:
-                trip_id = row.get('trip_id')
-                headsign = row.get('trip_headsign')
-                route_id = row.get('route_id')
-                direction_id = row.get('direction_id')
+                # Skip rows too short to hold the required columns
+                if len(row) <= max(trip_id_idx, route_id_idx):
+                    continue
+                trip_id = row[trip_id_idx]
+                route_id = row[route_id_idx]
+                # Few distinct headsigns across ~20k trips, so share one str per value
+                headsign = sys.intern(row[headsign_idx]) if 0 <= headsign_idx < len(row) else ''
+                direction_id = row[direction_id_idx] if 0 <= direction_id_idx < len(row) else ''
                 
                 if trip_id and headsign:
                     headsign_by_trip_id[trip_id] = headsign
                 
-                # Also build route+direction lookup
-                if route_id and direction_id is not None and headsign:
-                    key = f"{route_id}_{direction_id}"
-                    if key not in headsign_by_route_direction:
-                        headsign_by_route_direction[key] = set()
-                    headsign_by_route_direction[key].add(headsign)
+                # Also build route+direction lookup, keeping the first headsign
+                # seen (they should be consistent for a route+direction)
+                if route_id and direction_id and headsign:
+                    try:
+                        direction_id = int(direction_id)
+                    except ValueError:
+                        # One malformed row shouldn't empty the whole lookup
+                        continue
+                    headsign_by_route_direction.setdefault((route_id, direction_id), headsign)
     except Exception as e:
         print(f"Error loading trips headsigns: {e}")
+        loaded = False
     
-    # Convert sets to most common headsign for each route+direction
-    for key, headsigns in headsign_by_route_direction.items():
-        # Use the first headsign (they should be consistent for a route+direction)
-        headsign_by_route_direction[key] = list(headsigns)[0]
-    
+    # Only cache a complete parse
+    if loaded:
+        write_gtfs_cache('trips', [trips_file], (headsign_by_trip_id, headsign_by_route_direction))
     return headsign_by_trip_id, headsign_by_route_direction
 
+# Static GTFS lookups never change at runtime, so load them once at import
+STOPS = load_stops_data()
+TRIPS_HEADSIGN_BY_ID, TRIPS_HEADSIGN_BY_ROUTE_DIRECTION = load_trips_headsigns()
+print(f"Loaded {len(TRIPS_HEADSIGN_BY_ID)} trip headsigns and {len(TRIPS_HEADSIGN_BY_ROUTE_DIRECTION)} route+direction headsigns")
+
+def fetch_feed(endpoint):
+    """Fetch and parse a realtime feed, reusing the previous parse if it is unchanged"""
+    headers = {}
+    cached = feed_cache.get(endpoint)
+    if cached:
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+    response = session.get(endpoint, headers=headers, timeout=5)
+
+    # Feed unchanged since the last fetch - reuse the parsed copy
+    if response.status_code == 304 and cached:
+        return cached['feed']
+
+    response.raise_for_status()
+    # Parsed in the worker thread so each feed is decoded as soon as it
+    # arrives, overlapping with the downloads still in flight
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.ParseFromString(response.content)
+    feed_cache[endpoint] = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'feed': feed
+    }
+    return feed
+
+def filter_feed(feed, target_stops, latest_arrival):
+    """Return (stop_id, route_id, direction_id, arrival_time, trip_id) rows for arrivals at target_stops up to latest_arrival"""
+    rows = []
+    for entity in feed.entity:
+        if not entity.HasField('trip_update'):
+            continue
+        trip_update = entity.trip_update
+        trip = None
+        
+        for stop_time_update in trip_update.stop_time_update:
+            stop_id = stop_time_update.stop_id
+            if stop_id not in target_stops or not stop_time_update.HasField('arrival'):
+                continue
+            
+            arrival_time = stop_time_update.arrival.time
+            if arrival_time > latest_arrival:
+                # Stop updates are in trip order, so the rest of this trip arrives even later
+                break
+            
+            # Only read the trip descriptor for trips that stop at a target stop
+            if trip is None:
+                trip = trip_update.trip
+                # Interned so every row shares one str per route
+                route_id = sys.intern(trip.route_id)
+                direction_id = trip.direction_id if trip.HasField('direction_id') else None
+            rows.append((sys.intern(stop_id), route_id, direction_id, arrival_time, trip.trip_id))
+    
+    return rows
+
+def serialize_payload(payload):
+    """Encode an /api/data payload once, returning the JSON bytes and their ETag"""
+    body = orjson.dumps(payload)
+    return body, hashlib.blake2b(body, digest_size=8).hexdigest()
+
+# Set to make the updater thread fetch now rather than at its next tick
+refresh_requested = threading.Event()
+# Minimum seconds between the end of a fetch and a requested refresh
+REFRESH_MIN_INTERVAL = 5
+# Monotonic time the updater thread last finished a fetch
+last_fetch_finished = float('-inf')
+
+# Pre-serialized /api/data body and ETag. Replaced wholesale on each update;
+# rebinding the name is atomic, so readers need no lock
+latest_response = serialize_payload({})
+
 def fetch_mta_data():
     """Fetch and process MTA data"""
-    global latest_data
-    global trips_headsign_by_id
-    global trips_headsign_by_route_direction
-    
-    # Load stops data
-    stops = load_stops_data()
-    # Lazy-load trips headsigns once per process
-    if trips_headsign_by_id is None:
-        trips_headsign_by_id, trips_headsign_by_route_direction = load_trips_headsigns()
-        print(f"Loaded {len(trips_headsign_by_id)} trip headsigns and {len(trips_headsign_by_route_direction)} route+direction headsigns")
+    global latest_response
     
-    # Fetch data from multiple endpoints
+    # Fetch and parse all endpoints concurrently
     feeds = []
-    endpoints = [
-        'https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs-nqrw',
-        'https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs',
-        'https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs-l'
-    ]
+    futures = [(endpoint, fetch_executor.submit(fetch_feed, endpoint)) for endpoint in MTA_ENDPOINTS]
 
-    for endpoint in endpoints:
+    for endpoint, future in futures:
         try:
-            response = requests.get(endpoint)
-            feed = gtfs_realtime_pb2.FeedMessage()
-            feed.ParseFromString(response.content)
-            feeds.append(feed)
+            feeds.append(future.result())
         except Exception as e:
             print(f"Error loading feed from {endpoint}: {e}")
 
-    # Combine all entities from all feeds
-    all_entities = []
-    for feed in feeds:
-        all_entities.extend(feed.entity)
-
-    # Get current time
-    current_time = datetime.now(timezone.utc)
+    # Get current time in epoch seconds, the same unit as the feed's arrival times
+    now_epoch = datetime.now(timezone.utc).timestamp()
+    # Latest arrival that can still fall in the 10 minute window
+    latest_arrival = now_epoch + 10 * 60
 
     # Dictionary to group results by station and direction
     grouped_results = {}
 
-    for entity in all_entities:
-        if entity.HasField('trip_update'):
-            trip_update = entity.trip_update
+    for feed in feeds:
+        for stop_id, route_id, direction_id, arrival_epoch, trip_id in filter_feed(feed, TARGET_STOPS, latest_arrival):
+            minutes_from_now = (arrival_epoch - now_epoch) / 60
             
-            # Process stop time updates and filter for my stops
-            for stop_time_update in trip_update.stop_time_update:
-                stop_id = stop_time_update.stop_id
-                stop_name = stops.get(stop_id, f"Unknown stop ({stop_id})")
+            # Only include arrivals within the next 10 minutes
+            if 0 <= minutes_from_now <= 10:
+                # Fall back to the direction implied by the platform's N/S suffix
+                if direction_id is None:
+                    direction_id = STOP_DIRECTION_IDS[stop_id]
+                else:
+                    # Anything other than 0 counts as Southbound
+                    direction_id = 0 if direction_id == 0 else 1
+                
+                # L trains use geographic names, other lines Uptown/Downtown
+                if route_id == 'L':
+                    direction, line_type = L_DIRECTION_LABELS[direction_id], 'L Train'
+                else:
+                    direction, line_type = DIRECTION_LABELS[direction_id], 'Other Lines'
+                
+                # Create key for grouping by station ID instead of station name
+                group_key = (stop_id, direction, line_type)
                 
-                # Filter for specific stop_ids and check arrival time
-                if stop_id in ["634N", "634S", "635N", "635S", "L03N", "L03S", "R19N", "R19S", "R20N", "R20S"] and stop_time_update.HasField('arrival'):
-                    arrival_time = datetime.fromtimestamp(stop_time_update.arrival.time, tz=timezone.utc)
-                    minutes_from_now = (arrival_time - current_time).total_seconds() / 60
-                    
-                    # Only include arrivals within the next 10 minutes
-                    if 0 <= minutes_from_now <= 10:
-                        # Determine direction from stop_id or trip direction
-                        direction = "Unknown"
-                        if trip_update.trip.HasField('direction_id'):
-                            direction = "Northbound" if trip_update.trip.direction_id == 0 else "Southbound"
-                        else:
-                            # Fallback: determine from stop_id suffix
-                            if stop_id.endswith('N'):
-                                direction = "Northbound"
-                            elif stop_id.endswith('S'):
-                                direction = "Southbound"
-                        
-                        # Convert direction labels for non-L trains
-                        if trip_update.trip.route_id != 'L':
-                            if direction == "Northbound":
-                                direction = "Uptown"
-                            elif direction == "Southbound":
-                                direction = "Downtown"
-                        
-                        # Create key for grouping by station ID instead of station name
-                        group_key = (stop_id, direction)
-                        
-                        # Initialize group if it doesn't exist
-                        if group_key not in grouped_results:
-                            grouped_results[group_key] = []
-                        
-                        # Try to get destination from trip_id first, then route+direction
-                        trip_id = trip_update.trip.trip_id
-                        destination = trips_headsign_by_id.get(trip_id, '')
-                        
-                        # If no destination from trip_id, try route+direction lookup
-                        if not destination:
-                            direction_id = None
-                            if trip_update.trip.HasField('direction_id'):
-                                direction_id = trip_update.trip.direction_id
-                            else:
-                                # Fallback: determine direction from stop_id suffix
-                                if stop_id.endswith('N'):
-                                    direction_id = 0  # Northbound
-                                elif stop_id.endswith('S'):
-                                    direction_id = 1  # Southbound
-                            
-                            if direction_id is not None:
-                                route_direction_key = f"{trip_update.trip.route_id}_{direction_id}"
-                                destination = trips_headsign_by_route_direction.get(route_direction_key, '')
-                                # Destination found or not found - no need to log every lookup
-                        
-                        # Add train info to the group
-                        grouped_results[group_key].append({
-                            'route': trip_update.trip.route_id,
-                            'minutes': minutes_from_now,
-                            'stop_id': stop_id,
-                            'destination': destination
-                        })
-
-    # Process and organize the data for display with pagination
+                # Initialize group if it doesn't exist
+                if group_key not in grouped_results:
+                    grouped_results[group_key] = []
+                
+                # Try to get destination from trip_id first, then route+direction
+                destination = TRIPS_HEADSIGN_BY_ID.get(trip_id, '')
+                
+                # If no destination from trip_id, try route+direction lookup
+                if not destination:
+                    destination = TRIPS_HEADSIGN_BY_ROUTE_DIRECTION.get((route_id, direction_id), '')
+                
+                # Add train info to the group as a compact (route, minutes, stop_id, destination) record
+                grouped_results[group_key].append((route_id, minutes_from_now, stop_id, destination))
+
+    # Process and organize the data for display; the browser paginates the trains
     processed_data = []
     
-    for (stop_id, direction), trains in grouped_results.items():
+    for (stop_id, direction, line_type), trains in grouped_results.items():
         # Get station name from stop_id
-        stop_name = stops.get(stop_id, f"Unknown stop ({stop_id})")
+        stop_name = STOPS.get(stop_id, f"Unknown stop ({stop_id})")
         
         # Sort trains by arrival time (soonest first)
-        trains.sort(key=lambda x: x['minutes'])
-        
-        # Separate L trains from other trains
-        l_trains = [train for train in trains if train['route'] == 'L']
-        other_trains = [train for train in trains if train['route'] != 'L']
-        
-        # Process L trains separately with custom direction names
-        if l_trains:
-            # Reclassify L train directions
-            l_direction = "Manhattan Bound" if direction == "Northbound" else "Brooklyn Bound"
-            
-            # Paginate L trains - show 5 per page
-            trains_per_page = 5
-            total_pages = (len(l_trains) + trains_per_page - 1) // trains_per_page  # Ceiling division
-            
-            for page in range(total_pages):
-                start_idx = page * trains_per_page
-                end_idx = min(start_idx + trains_per_page, len(l_trains))
-                page_trains = l_trains[start_idx:end_idx]
-                
-                processed_data.append({
-                    'station': stop_name,
-                    'station_id': stop_id,
-                    'direction': l_direction,
-                    'trains': page_trains,
-                    'page': page + 1,
-                    'total_pages': total_pages,
-                    'line_type': 'L Train'
-                })
+        trains.sort(key=itemgetter(1))
         
-        # Process other trains with original direction names
-        if other_trains:
-            # Paginate other trains - show 5 per page
-            trains_per_page = 5
-            total_pages = (len(other_trains) + trains_per_page - 1) // trains_per_page  # Ceiling division
-            
-            for page in range(total_pages):
-                start_idx = page * trains_per_page
-                end_idx = min(start_idx + trains_per_page, len(other_trains))
-                page_trains = other_trains[start_idx:end_idx]
-                
-                processed_data.append({
-                    'station': stop_name,
-                    'station_id': stop_id,
-                    'direction': direction,
-                    'trains': page_trains,
-                    'page': page + 1,
-                    'total_pages': total_pages,
-                    'line_type': 'Other Lines'
-                })
+        processed_data.append({
+            'station': stop_name,
+            'station_id': stop_id,
+            'direction': direction,
+            # Expand the records into the dicts the page expects only when serializing
+            'trains': [
+                {'route': route, 'minutes': minutes, 'stop_id': train_stop_id, 'destination': destination}
+                for route, minutes, train_stop_id, destination in trains
+            ],
+            'line_type': line_type
+        })
     
-    # Update global data with thread safety
-    with data_lock:
-        latest_data = {
-            'data': processed_data,
-            'last_updated': datetime.now().strftime('%H:%M:%S'),
-            'total_sections': len(processed_data)
-        }
+    # Serialize once per update rather than per request, then publish the
+    # body and ETag together with a single rebind
+    latest_response = serialize_payload({
+        'data': processed_data,
+        'last_updated': datetime.now().strftime('%H:%M:%S'),
+        'total_sections': len(processed_data)
+    })
 
 def data_updater():
     """Background thread to continuously update MTA data"""
+    global last_fetch_finished
+    # Ticks are scheduled on a monotonic clock so the time spent fetching
+    # doesn't push each update later than the last
+    next_tick = time.monotonic()
     while True:
+        # Sleep until the next tick, waking early if a refresh was requested
+        refreshed = refresh_requested.wait(max(0, next_tick - time.monotonic()))
+        refresh_requested.clear()
+        # A refresh that lands on a due tick just counts as the tick
+        refreshed = refreshed and time.monotonic() < next_tick
+        if refreshed:
+            # Ignore refreshes right after a fetch so repeated requests can't
+            # make us hit the MTA endpoints back to back
+            if time.monotonic() - last_fetch_finished < REFRESH_MIN_INTERVAL:
+                continue
+        
         try:
             fetch_mta_data()
-            time.sleep(30)  # Update every 30 seconds
         except Exception as e:
             print(f"Error updating data: {e}")
-            time.sleep(60)  # Wait longer on error
+            next_tick = time.monotonic() + 60  # Wait longer on error
+        else:
+            if refreshed:
+                # Hold off a scheduled tick that would land right after the refresh
+                next_tick = max(next_tick, time.monotonic() + REFRESH_MIN_INTERVAL)
+            else:
+                # Update every 30 seconds; after an overrun, start again from
+                # now rather than running back-to-back fetches to catch up
+                next_tick = max(next_tick + 30, time.monotonic())
+        finally:
+            last_fetch_finished = time.monotonic()
 
 @app.route('/')
 def index():
@@ -254,8 +409,21 @@ def index():
 
 @app.route('/api/data')
 def get_data():
-    with data_lock:
-        return jsonify(latest_data)
+    body, etag = latest_response
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Answers 304 Not Modified when If-None-Match has the current ETag
+    return response.make_conditional(request)
+
+@app.route('/api/refresh', methods=['POST'])
+def refresh_data():
+    # Data fetched moments ago is as fresh as a refresh would make it
+    if time.monotonic() - last_fetch_finished < REFRESH_MIN_INTERVAL:
+        return jsonify({'status': 'data is already fresh'}), 200
+    
+    # Wake the updater thread instead of waiting for the next scheduled update
+    refresh_requested.set()
+    return jsonify({'status': 'refresh scheduled'}), 202
 
 if __name__ == '__main__':
     # Start background thread for data updates
@@ -9,9 +9,18 @@ stops = {}
 stops_file = os.path.join(os.path.dirname(__file__), 'gtfs_subway', 'stops.txt')
 
 with open(stops_file, 'r') as f:
-    reader = csv.DictReader(f)
+    reader = csv.reader(f)
+    header = next(reader)
+    stop_id_idx = header.index('stop_id')
+    stop_name_idx = header.index('stop_name')
     for row in reader:
-        stops[row['stop_id']] = row['stop_name']
+        # Skip blank or short rows (DictReader used to drop blank lines)
+        if len(row) <= max(stop_id_idx, stop_name_idx):
+            continue
+        stops[row[stop_id_idx]] = row[stop_name_idx]
+
+# Platform stop_ids to report on
+TARGET_STOPS = frozenset({"634N", "634S", "635N", "635S", "L03N", "L03S"})
 
 # Fetch data from both endpoints
 feeds = []
@@ -41,31 +50,16 @@ current_time = datetime.now(timezone.utc)
 # Dictionary to group results by station and direction
 grouped_results = {}
 
-# Debug counters
-total_entities = 0
-trip_updates = 0
-matching_stops = 0
-# print(f"Processing {len(all_entities)} total entities...")
-
 for entity in all_entities:
-    total_entities += 1
     if entity.HasField('trip_update'):
-        trip_updates += 1
         trip_update = entity.trip_update
         
         # Process stop time updates and filter for my stops
         for stop_time_update in trip_update.stop_time_update:
             stop_id = stop_time_update.stop_id
-            stop_name = stops.get(stop_id, f"Unknown stop ({stop_id})")
-            
-            # Debug: print first few matching stops
-            if stop_id in ["634N", "634S", "635N", "635S", "L03N", "L03S"]:
-                matching_stops += 1
-                # if matching_stops <= 5:  # Print first 5 matches for debugging
-                #     print(f"Found stop: {stop_id} ({stop_name}) - Route: {trip_update.trip.route_id}")
             
             # Filter for specific stop_ids and check arrival time
-            if stop_id in ["634N", "634S", "635N", "635S", "L03N", "L03S"] and stop_time_update.HasField('arrival'):
+            if stop_id in TARGET_STOPS and stop_time_update.HasField('arrival'):
                 arrival_time = datetime.fromtimestamp(stop_time_update.arrival.time, tz=timezone.utc)
                 minutes_from_now = (arrival_time - current_time).total_seconds() / 60
                 
@@ -83,6 +77,7 @@ for entity in all_entities:
                             direction = "Southbound"
                     
                     # Create key for grouping
+                    stop_name = stops.get(stop_id, f"Unknown stop ({stop_id})")
                     group_key = (stop_name, direction)
                     
                     # Initialize group if it doesn't exist
@@ -96,13 +91,6 @@ for entity in all_entities:
                         'stop_id': stop_id
                     })
 
-# # Debug summary
-# print(f"\nDebug Summary:")
-# print(f"Total entities processed: {total_entities}")
-# print(f"Trip updates found: {trip_updates}")
-# print(f"Matching stops found: {matching_stops}")
-# print(f"Results to display: {len(grouped_results)} groups")
-
 # Sort and display results
 for (stop_name, direction), trains in grouped_results.items():
     # Sort trains by arrival time (soonest first)